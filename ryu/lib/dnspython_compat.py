@@ -26,23 +26,33 @@ from __future__ import annotations
 import importlib
 import importlib.abc
 import importlib.util
+import re
 import sys
-from typing import Optional
+from typing import Optional, Tuple
 
 
 _ALIAS = "dns.rdtypes.tlsabase"
 _TARGET = "dns.rdtypes.tlsa_base"
 
+_VERSION_RE = re.compile(r"\s*(\d+)\.(\d+)")
 
-def _parse_version(value: str) -> Optional["object"]:
-    try:
-        from packaging import version
-    except ImportError:
-        return None
-    try:
-        return version.parse(value)
-    except Exception:
+_INSTALLED: bool = False
+
+
+def _cached_import(name: str):
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return importlib.import_module(name)
+
+
+def _parse_version(value: str) -> Optional[Tuple[int, int]]:
+    # Only the major/minor pair matters here, so avoid pulling in
+    # packaging (and pyparsing) on every interpreter start.
+    match = _VERSION_RE.match(value)
+    if match is None:
         return None
+    return int(match.group(1)), int(match.group(2))
 
 
 class _AliasModuleFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
@@ -53,27 +63,27 @@ class _AliasModuleFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
     def find_spec(self, fullname, path, target=None):
         if fullname != self._alias:
             return None
-        target_spec = importlib.util.find_spec(self._target)
-        if target_spec is None:
-            return None
+        # The target is normally loaded already; only probe the import
+        # system when it is not.
+        if self._target not in sys.modules:
+            if importlib.util.find_spec(self._target) is None:
+                return None
         return importlib.util.spec_from_loader(fullname, self)
 
     def create_module(self, spec):
         return None
 
     def exec_module(self, module):
-        target_mod = importlib.import_module(self._target)
+        target_mod = _cached_import(self._target)
         sys.modules[self._alias] = target_mod
 
 
 def _install_alias_importer() -> None:
-    if any(
-        isinstance(finder, _AliasModuleFinder)
-        and finder._alias == _ALIAS
-        for finder in sys.meta_path
-    ):
+    global _INSTALLED
+    if _INSTALLED:
         return
     sys.meta_path.insert(0, _AliasModuleFinder(_ALIAS, _TARGET))
+    _INSTALLED = True
 
 
 def patch_eventlet_dnspython() -> bool:
@@ -85,18 +95,12 @@ def patch_eventlet_dnspython() -> bool:
         return False
 
     parsed = _parse_version(getattr(dns, "__version__", ""))
-    if parsed is not None:
-        try:
-            from packaging import version
-        except ImportError:
-            parsed = None
-        else:
-            if parsed < version.parse("2.0.0"):
-                return False
+    if parsed is not None and parsed < (2, 0):
+        return False
 
     tlsa_base_mod = None
     try:
-        tlsa_base_mod = importlib.import_module(_TARGET)
+        tlsa_base_mod = _cached_import(_TARGET)
     except ImportError:
         tlsa_base_mod = None
 
@@ -104,7 +108,13 @@ def patch_eventlet_dnspython() -> bool:
         rdtypes.tlsabase = rdtypes.tlsa_base
 
     if tlsa_base_mod is not None:
+        # Fast path for plain imports. The finder is still needed because
+        # eventlet's import_patched() drops the alias from sys.modules
+        # before importing it again.
         sys.modules.setdefault(_ALIAS, tlsa_base_mod)
 
     _install_alias_importer()
     return True
+
+
+apply = patch_eventlet_dnspython
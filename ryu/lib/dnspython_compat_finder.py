@@ -0,0 +1,44 @@
+# Copyright (C) 2024 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Start-up hook for the dnspython compatibility patch.
+
+Loaded from ``ryu_compat.pth``. It only registers a meta path finder;
+``dns`` and :mod:`ryu.lib.dnspython_compat` are not imported until
+``dns.rdtypes.tlsabase`` is actually requested.
+"""
+
+import sys
+
+_ALIAS = "dns.rdtypes.tlsabase"
+
+_INSTALLED = False
+
+
+class _LazyAliasFinder(object):
+    def find_spec(self, fullname, path, target=None):
+        if fullname != _ALIAS:
+            return None
+        from ryu.lib import dnspython_compat
+        finder = dnspython_compat._AliasModuleFinder(
+            dnspython_compat._ALIAS, dnspython_compat._TARGET)
+        return finder.find_spec(fullname, path, target)
+
+
+def install():
+    global _INSTALLED
+    if _INSTALLED:
+        return
+    sys.meta_path.append(_LazyAliasFinder())
+    _INSTALLED = True
@@ -28,7 +28,7 @@ HUB_TYPE = os.getenv('RYU_HUB_TYPE', 'eventlet')
 LOG = logging.getLogger('ryu.lib.hub')
 
 if HUB_TYPE == 'eventlet':
-    dnspython_compat.apply()
+    dnspython_compat.patch_eventlet_dnspython()
     import eventlet
     # HACK:
     # sleep() is the workaround for the following issue.
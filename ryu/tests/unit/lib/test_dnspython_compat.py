@@ -0,0 +1,74 @@
+# Copyright (C) 2024 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from ryu.lib import dnspython_compat
+
+
+class Test_dnspython_compat(unittest.TestCase):
+    """Test cases for ryu.lib.dnspython_compat.
+    """
+
+    def setUp(self):
+        # A minimal dnspython 2.x layout: tlsa_base without tlsabase.
+        self.dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.dir, 'dns', 'rdtypes'))
+        files = {
+            'dns/__init__.py': '__version__ = "2.4.2"\n',
+            'dns/rdtypes/__init__.py': '',
+            'dns/rdtypes/tlsa_base.py': '',
+        }
+        for name, body in files.items():
+            with open(os.path.join(self.dir, name), 'w') as f:
+                f.write(body)
+        sys.path.insert(0, self.dir)
+
+        self.saved_modules = dict(
+            (name, sys.modules.pop(name)) for name in list(sys.modules)
+            if name == 'dns' or name.startswith('dns.'))
+        self.saved_meta_path = list(sys.meta_path)
+        self.saved_installed = dnspython_compat._INSTALLED
+        dnspython_compat._INSTALLED = False
+        importlib.invalidate_caches()
+
+    def tearDown(self):
+        for name in list(sys.modules):
+            if name == 'dns' or name.startswith('dns.'):
+                del sys.modules[name]
+        sys.modules.update(self.saved_modules)
+        sys.meta_path[:] = self.saved_meta_path
+        dnspython_compat._INSTALLED = self.saved_installed
+        sys.path.remove(self.dir)
+        shutil.rmtree(self.dir)
+
+    def test_patch_seeds_alias(self):
+        self.assertTrue(dnspython_compat.patch_eventlet_dnspython())
+        self.assertIs(sys.modules['dns.rdtypes.tlsa_base'],
+                      sys.modules['dns.rdtypes.tlsabase'])
+
+    def test_reimport_after_pop(self):
+        # eventlet's import_patched() removes the module from sys.modules
+        # and imports it again.
+        dnspython_compat.patch_eventlet_dnspython()
+        sys.modules.pop('dns.rdtypes.tlsabase')
+        __import__('dns.rdtypes.tlsabase')
+        self.assertIs(sys.modules['dns.rdtypes.tlsa_base'],
+                      sys.modules['dns.rdtypes.tlsabase'])
@@ -0,0 +1,71 @@
+# Copyright (C) 2024 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from ryu.lib import dnspython_compat_finder
+
+
+class Test_dnspython_compat_finder(unittest.TestCase):
+    """Test cases for ryu.lib.dnspython_compat_finder.
+    """
+
+    def setUp(self):
+        # A minimal dnspython 2.x layout: tlsa_base without tlsabase.
+        self.dir = tempfile.mkdtemp()
+        rdtypes = os.path.join(self.dir, 'dns', 'rdtypes')
+        os.makedirs(rdtypes)
+        for name in ('dns/__init__.py', 'dns/rdtypes/__init__.py',
+                     'dns/rdtypes/tlsa_base.py'):
+            with open(os.path.join(self.dir, name), 'w') as f:
+                f.write('')
+        sys.path.insert(0, self.dir)
+
+        self.saved_modules = dict(
+            (name, sys.modules.pop(name)) for name in list(sys.modules)
+            if name == 'dns' or name.startswith('dns.'))
+        self.saved_meta_path = list(sys.meta_path)
+        self.saved_installed = dnspython_compat_finder._INSTALLED
+        dnspython_compat_finder._INSTALLED = False
+        importlib.invalidate_caches()
+
+    def tearDown(self):
+        for name in list(sys.modules):
+            if name == 'dns' or name.startswith('dns.'):
+                del sys.modules[name]
+        sys.modules.update(self.saved_modules)
+        sys.meta_path[:] = self.saved_meta_path
+        dnspython_compat_finder._INSTALLED = self.saved_installed
+        sys.path.remove(self.dir)
+        shutil.rmtree(self.dir)
+
+    def test_install_is_lazy(self):
+        dnspython_compat_finder.install()
+        self.assertNotIn('dns', sys.modules)
+
+        tlsabase = importlib.import_module('dns.rdtypes.tlsabase')
+        self.assertIs(sys.modules['dns.rdtypes.tlsa_base'], tlsabase)
+
+    def test_install_once(self):
+        dnspython_compat_finder.install()
+        dnspython_compat_finder.install()
+        finders = [f for f in sys.meta_path
+                   if isinstance(f, dnspython_compat_finder._LazyAliasFinder)]
+        self.assertEqual(1, len(finders))
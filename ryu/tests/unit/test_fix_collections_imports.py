@@ -0,0 +1,223 @@
+# Copyright (C) 2024 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import ast
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+_TOOL = os.path.join(os.path.dirname(__file__), '..', '..', '..',
+                     'tools', 'fix_collections_imports.py')
+
+
+def _load_tool():
+    spec = importlib.util.spec_from_file_location(
+        'fix_collections_imports', _TOOL)
+    module = importlib.util.module_from_spec(spec)
+    # dataclasses looks the defining module up in sys.modules.
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+fixer = _load_tool()
+
+
+class Test_multiline_from_collections_import(unittest.TestCase):
+    """Test cases for process_multiline_from_collections_import.
+    """
+
+    def _rewrite(self, source):
+        lines = fixer.split_lines(source)
+        new_lines, changes = \
+            fixer.process_multiline_from_collections_import(lines, 1, '\n')
+        result = ''.join(new_lines)
+        ast.parse(result)
+        return result, [change.description for change in changes]
+
+    def test_trailing_comma(self):
+        result, changes = self._rewrite(
+            'from collections import (\n'
+            '    OrderedDict,\n'
+            '    MutableMapping,\n'
+            ')\n')
+        self.assertEqual(
+            'from collections import (\n'
+            '    OrderedDict,\n'
+            ')\n'
+            'from collections.abc import MutableMapping\n', result)
+        self.assertEqual(['removed MutableMapping from collections import'],
+                         changes)
+
+    def test_last_item(self):
+        result, _ = self._rewrite(
+            'from collections import (OrderedDict,\n'
+            '                         MutableMapping)\n')
+        self.assertEqual(
+            'from collections import (OrderedDict)\n'
+            'from collections.abc import MutableMapping\n', result)
+
+    def test_first_item(self):
+        result, _ = self._rewrite(
+            'from collections import (MutableMapping,\n'
+            '                         OrderedDict)\n')
+        self.assertEqual(
+            'from collections import (\n'
+            '                         OrderedDict)\n'
+            'from collections.abc import MutableMapping\n', result)
+
+    def test_backslash(self):
+        result, _ = self._rewrite(
+            'from collections import OrderedDict, \\\n'
+            '    MutableMapping\n')
+        self.assertEqual(
+            'from collections import OrderedDict\n'
+            'from collections.abc import MutableMapping\n', result)
+
+    def test_comments(self):
+        result, _ = self._rewrite(
+            'from collections import (  # containers\n'
+            '    OrderedDict,  # ordered\n'
+            '    MutableMapping,  # abc\n'
+            ')\n')
+        self.assertEqual(
+            'from collections import (  # containers\n'
+            '    OrderedDict,  # ordered\n'
+            '    # abc\n'
+            ')\n'
+            'from collections.abc import MutableMapping\n', result)
+
+    def test_alias(self):
+        result, _ = self._rewrite(
+            'from collections import (\n'
+            '    MutableMapping as MM,\n'
+            '    OrderedDict,\n'
+            ')\n')
+        self.assertEqual(
+            'from collections import (\n'
+            '    OrderedDict,\n'
+            ')\n'
+            'from collections.abc import MutableMapping as MM\n', result)
+
+    def test_only_mutable_mapping(self):
+        result, changes = self._rewrite(
+            'from collections import (\n'
+            '    MutableMapping,\n'
+            ')\n')
+        self.assertEqual(
+            'from collections.abc import (\n'
+            '    MutableMapping,\n'
+            ')\n', result)
+        self.assertEqual(
+            ['replaced collections import with collections.abc '
+             'for MutableMapping'], changes)
+
+    def test_no_mutable_mapping(self):
+        source = ('from collections import (\n'
+                  '    OrderedDict,\n'
+                  '    defaultdict,\n'
+                  ')\n')
+        result, changes = self._rewrite(source)
+        self.assertEqual(source, result)
+        self.assertEqual([], changes)
+
+
+class Test_process_file(unittest.TestCase):
+    """Test cases for process_file.
+    """
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _process(self, source):
+        path = Path(self.dir, 'target.py')
+        path.write_bytes(source.encode('utf-8'))
+        result = fixer.process_file(path, dry_run=False, backup_ext='.bak')
+        return result, path.read_bytes().decode('utf-8')
+
+    def test_abc_import_after_multiline_import(self):
+        result, content = self._process(
+            'from collections import (\n'
+            '    OrderedDict,\n'
+            '    defaultdict,\n'
+            ')\n'
+            'from typing import MutableMapping\n')
+        ast.parse(content)
+        self.assertTrue(result.updated)
+        self.assertEqual(
+            'from collections import (\n'
+            '    OrderedDict,\n'
+            '    defaultdict,\n'
+            ')\n'
+            'import collections.abc\n'
+            'from typing import MutableMapping\n', content)
+
+    def test_abc_import_not_inside_string(self):
+        result, content = self._process(
+            'import collections\n'
+            '"""\n'
+            'from collections import MutableMapping\n'
+            '"""\n'
+            'x = collections.abc.Mapping\n')
+        self.assertTrue(result.updated)
+        self.assertEqual(
+            'import collections\n'
+            'import collections.abc\n'
+            '"""\n'
+            'from collections import MutableMapping\n'
+            '"""\n'
+            'x = collections.abc.Mapping\n', content)
+
+    def test_crlf_kept(self):
+        _, content = self._process(
+            'import collections\r\n'
+            'from collections import (\r\n'
+            '    OrderedDict,\r\n'
+            '    MutableMapping,\r\n'
+            ')\r\n'
+            'x = collections.Iterable\r\n')
+        self.assertEqual(
+            'import collections\r\n'
+            'from collections import (\r\n'
+            '    OrderedDict,\r\n'
+            ')\r\n'
+            'from collections.abc import MutableMapping\r\n'
+            'x = collections.abc.Iterable\r\n', content)
+
+    def test_failed_write_removes_tmp(self):
+        source = 'import collections\nx = collections.Iterable\n'
+        path = Path(self.dir, 'target.py')
+        path.write_bytes(source.encode('utf-8'))
+        with mock.patch.object(fixer.shutil, 'copymode',
+                               side_effect=OSError('boom')):
+            self.assertRaises(OSError, fixer.process_file, path,
+                              dry_run=False, backup_ext='.bak')
+        self.assertFalse(Path(self.dir, 'target.py.tmp').exists())
+        self.assertEqual(source, path.read_bytes().decode('utf-8'))
+
+    def test_unchanged_file(self):
+        source = 'import os\n'
+        result, content = self._process(source)
+        self.assertFalse(result.updated)
+        self.assertEqual(source, content)
@@ -0,0 +1,236 @@
+# Copyright (C) 2024 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+_TOOLS = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'tools')
+
+
+def _load_tool():
+    spec = importlib.util.spec_from_file_location(
+        'ryu_modernize', os.path.join(_TOOLS, 'ryu_modernize.py'))
+    module = importlib.util.module_from_spec(spec)
+    # dataclasses looks the defining module up in sys.modules.
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+modernize = _load_tool()
+
+_REQUIREMENTS = (
+    'eventlet==0.30.0\n'
+    'six\n'
+    'webob[testing]>=1.0\n'
+    'routes @ https://example.com/routes-2.5.1.whl\n'
+)
+
+_LEGACY = 'import collections\n\nx = collections.Iterable\n'
+
+_WSGI = (
+    'from webob import Response\n'
+    '\n'
+    '\n'
+    'class _AlreadyHandledResponse(Response):\n'
+    '    _ALREADY_HANDLED = None\n'
+    '\n'
+    '\n'
+    'def websocket(name, path):\n'
+    '    pass\n'
+)
+
+_HUB = (
+    'import os\n'
+    '\n'
+    "if os.getenv('RYU_HUB_TYPE', 'eventlet') == 'eventlet':\n"
+    '    import eventlet\n'
+)
+
+
+def _new_state():
+    return {'backups': set(), 'created_files': set()}
+
+
+class Test_normalize_requirement_line(unittest.TestCase):
+    """Test cases for normalize_requirement_line.
+    """
+
+    def test_names(self):
+        for line, name in [('eventlet', 'eventlet'),
+                           ('Eventlet==0.30.0', 'eventlet'),
+                           ('  oslo.config >= 5.2.0', 'oslo.config'),
+                           ("greenlet; python_version < '4'", 'greenlet')]:
+            self.assertEqual(name, modernize.normalize_requirement_line(line))
+
+    def test_left_alone(self):
+        for line in ['', '# eventlet', 'eventlet  # pinned elsewhere',
+                     'eventlet[foo]>=0.30',
+                     'eventlet @ https://example.com/eventlet.whl',
+                     '-r other.txt']:
+            self.assertIsNone(modernize.normalize_requirement_line(line))
+
+
+class Test_update_requirements(unittest.TestCase):
+    """Test cases for update_requirements.
+    """
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = Path(self.dir, 'requirements.txt')
+        self.path.write_bytes(_REQUIREMENTS.encode('utf-8'))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_extras_and_direct_reference_kept(self):
+        changes = []
+        modernize.update_requirements(self.path, _new_state(), changes)
+        lines = self.path.read_text().splitlines()
+        self.assertEqual(1, len(changes))
+        self.assertEqual('eventlet>=0.33.3', lines[0])
+        self.assertIn('webob[testing]>=1.0', lines)
+        self.assertIn('routes @ https://example.com/routes-2.5.1.whl', lines)
+
+    def test_second_run_is_noop(self):
+        state = _new_state()
+        modernize.update_requirements(self.path, state, [])
+        content = self.path.read_bytes()
+
+        changes = []
+        with mock.patch.object(modernize, 'normalize_requirement_line') as m:
+            modernize.update_requirements(self.path, state, changes)
+        self.assertEqual([], changes)
+        # The stored hash short-circuits before any line is parsed.
+        self.assertFalse(m.called)
+        self.assertEqual(content, self.path.read_bytes())
+
+    def test_changed_pins_invalidate_hash(self):
+        state = _new_state()
+        modernize.update_requirements(self.path, state, [])
+
+        changes = []
+        pins = dict(modernize.REQUIRED_DEPENDENCIES, msgpack='>=2.0.0')
+        with mock.patch.object(modernize, 'REQUIRED_DEPENDENCIES', pins):
+            modernize.update_requirements(self.path, state, changes)
+        self.assertEqual(1, len(changes))
+        self.assertIn('msgpack>=2.0.0', self.path.read_text().splitlines())
+
+
+class Test_atomic_update(unittest.TestCase):
+    """Test cases for atomic_update.
+    """
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = Path(self.dir, 'target.py')
+        self.path.write_bytes(b'old\n')
+        self.backup = Path(self.dir, 'target.py' + modernize.BACKUP_EXT)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_backup_kept(self):
+        state = _new_state()
+        modernize.atomic_update(self.path, b'new\n', state)
+        self.assertEqual(b'new\n', self.path.read_bytes())
+        self.assertEqual(b'old\n', self.backup.read_bytes())
+        self.assertEqual({str(self.backup)}, state['backups'])
+
+        # A later update keeps the first backup.
+        modernize.atomic_update(self.path, b'newer\n', state)
+        self.assertEqual(b'newer\n', self.path.read_bytes())
+        self.assertEqual(b'old\n', self.backup.read_bytes())
+
+    def test_failure_cleans_up(self):
+        with mock.patch.object(modernize.os, 'replace',
+                               side_effect=OSError('boom')):
+            self.assertRaises(OSError, modernize.atomic_update,
+                              self.path, b'new\n', _new_state())
+        self.assertEqual(b'old\n', self.path.read_bytes())
+        self.assertFalse(Path(self.dir, 'target.py.tmp').exists())
+
+
+class Test_apply_rollback(unittest.TestCase):
+    """Test cases for apply and rollback on a scratch tree.
+    """
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        os.makedirs(str(self.root / 'tools'))
+        os.makedirs(str(self.root / 'ryu' / 'app'))
+        os.makedirs(str(self.root / 'ryu' / 'lib'))
+        shutil.copy(os.path.join(_TOOLS, 'fix_collections_imports.py'),
+                    str(self.root / 'tools'))
+        self.originals = {
+            'requirements.txt': _REQUIREMENTS,
+            'ryu/app/wsgi.py': _WSGI,
+            'ryu/lib/hub.py': _HUB,
+            'ryu/lib/legacy.py': _LEGACY,
+        }
+        for name, content in self.originals.items():
+            (self.root / name).write_bytes(content.encode('utf-8'))
+
+    def tearDown(self):
+        shutil.rmtree(str(self.root))
+
+    def _run(self, func, *args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(self.root, *args)
+
+    def _files(self):
+        return sorted(str(path.relative_to(self.root))
+                      for path in self.root.rglob('*') if path.is_file())
+
+    def test_apply_twice_then_rollback(self):
+        before = self._files()
+        self.assertEqual(0, self._run(modernize.apply, None, True))
+
+        state = json.loads(
+            (self.root / modernize.STATE_FILE).read_text())
+        # The fixer's backup comes from its --print-backups output.
+        self.assertIn(
+            str(self.root / 'ryu/lib/legacy.py') + modernize.BACKUP_EXT,
+            state['backups'])
+        for name, content in self.originals.items():
+            self.assertNotEqual(content, (self.root / name).read_text())
+
+        report_path = self.root / modernize.REPORT_JSON
+        self.assertEqual(0, self._run(modernize.apply, None, True))
+        second = report_path.read_bytes()
+        self.assertEqual(
+            ['Collections import fix log generated'],
+            [change['description']
+             for change in json.loads(second.decode('utf-8'))['changes']])
+
+        # A third run finds the same as the second and leaves the report,
+        # timestamp included, untouched.
+        self.assertEqual(0, self._run(modernize.apply, None, True))
+        self.assertEqual(second, report_path.read_bytes())
+
+        self.assertEqual(0, self._run(modernize.rollback))
+        self.assertEqual(before, self._files())
+        for name, content in self.originals.items():
+            self.assertEqual(content, (self.root / name).read_text())
@@ -23,6 +23,9 @@ import sysconfig
 import setuptools
 from setuptools.command.develop import develop as _develop
 
+# ryu.hooks only depends on setuptools and the version tuple in
+# ryu/__init__.py, so this does not import the runtime dependencies.
+# save_orig() has to run before setup() invokes pbr's setup hook.
 import ryu.hooks
 
 BASE_REQUIRES = [
@@ -50,16 +53,17 @@ def _dependency_overrides() -> list[str]:
 
 
 def _write_compat_pth() -> None:
-    site_dir = sysconfig.get_paths().get("purelib")
-    if not site_dir:
-        site_dir = sysconfig.get_paths().get("platlib")
+    paths = sysconfig.get_paths()
+    site_dir = paths.get("purelib") or paths.get("platlib")
     if not site_dir:
         return
     pth_path = os.path.join(site_dir, "ryu_compat.pth")
     with open(pth_path, "w", encoding="utf-8") as handle:
+        # Only register the lazy finder; dns and packaging are imported
+        # on demand rather than on every interpreter start.
         handle.write(
-            "import ryu.lib.dnspython_compat as _ryu_compat;"
-            " _ryu_compat.patch_eventlet_dnspython()\n"
+            "import ryu.lib.dnspython_compat_finder as _ryu_compat;"
+            " _ryu_compat.install()\n"
         )
 
 
@@ -72,9 +76,6 @@ class DevelopWithCompat(_develop):
 
 
 ryu.hooks.save_orig()
-setuptools.setup(name='ryu',
-                 setup_requires=['pbr'],
-                 pbr=True)
 setuptools.setup(
     name="ryu",
     setup_requires=["pbr"],
@@ -92,6 +93,7 @@ setuptools.setup(
             "*.xsd",
             "**/*.patch",
             "lib/dnspython_compat.py",
+            "lib/dnspython_compat_finder.py",
         ]
     },
     cmdclass={"develop": DevelopWithCompat},
@@ -3,14 +3,18 @@
 from __future__ import annotations
 
 import argparse
+import ast
+import functools
+import io
 import logging
 import os
 import re
 import shutil
 import tokenize
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 FROM_COLLECTIONS_RE = re.compile(r"^(?P<indent>\s*)from\s+collections\s+import\s+(?P<imports>.+)$")
 IMPORT_COLLECTIONS_RE = re.compile(r"^\s*import\s+(?P<imports>.+)$")
@@ -20,10 +24,19 @@ COLLECTIONS_ABC_IMPORT_RE = re.compile(
 COLLECTIONS_IMPORT_RE = re.compile(r"^\s*(import\s+collections\b|from\s+collections\s+import\b)")
 
 REPLACEMENTS = {
-    re.compile(r"\bcollections\.MutableMapping\b"): "collections.abc.MutableMapping",
-    re.compile(r"\bcollections\.Iterable\b"): "collections.abc.Iterable",
-    re.compile(r"\bcollections\.Callable\b"): "collections.abc.Callable",
+    "collections.MutableMapping": "collections.abc.MutableMapping",
+    "collections.Iterable": "collections.abc.Iterable",
+    "collections.Callable": "collections.abc.Callable",
 }
+COLLECTIONS_USAGE_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(name) for name in REPLACEMENTS) + r")\b"
+)
+REPLACED_ATTRIBUTES = frozenset(name.split(".", 1)[1] for name in REPLACEMENTS)
+# Cheap whole-file filter: anything the fixer could rewrite, or an existing
+# collections.abc usage that may need the import added.
+REWRITE_PROBE_RE = re.compile(
+    r"\bMutableMapping\b|\bcollections\.abc\b|" + COLLECTIONS_USAGE_RE.pattern
+)
 
 
 @dataclass
@@ -32,11 +45,24 @@ class Change:
     description: str
 
 
+# (level, msg, args) triples, emitted by the parent process since loggers
+# cannot be shared with the worker processes.
+LogMessage = Tuple[int, str, Tuple[object, ...]]
+
+
 @dataclass
 class FileResult:
     path: Path
     changes: List[Change]
     updated: bool
+    messages: List[LogMessage] = field(default_factory=list)
+    backup: Optional[Path] = None
+
+
+def split_lines(text: str) -> List[str]:
+    # Split like the tokenizer does (unlike str.splitlines, which also breaks
+    # on form feeds and other separators) so line numbers agree with the AST.
+    return io.StringIO(text, newline="").readlines()
 
 
 def split_comment(line: str) -> Tuple[str, str]:
@@ -59,19 +85,15 @@ def base_import_name(item: str) -> str:
     return item.strip()
 
 
-def process_from_collections_import(line: str, line_no: int) -> Tuple[List[str], List[Change]]:
+def process_from_collections_import(
+    line: str, line_no: int, line_ending: str
+) -> Tuple[List[str], List[Change]]:
     changes: List[Change] = []
     line_no_ending = line.rstrip("\r\n")
     match = FROM_COLLECTIONS_RE.match(line_no_ending)
     if not match:
         return [line], changes
 
-    line_ending = ""
-    if line.endswith("\r\n"):
-        line_ending = "\r\n"
-    elif line.endswith("\n"):
-        line_ending = "\n"
-
     indent = match.group("indent")
     imports_part = match.group("imports")
     code, comment = split_comment(imports_part)
@@ -102,46 +124,182 @@ def process_from_collections_import(line: str, line_no: int) -> Tuple[List[str],
     return new_lines, changes
 
 
-def replace_collections_usage(line: str, line_no: int) -> Tuple[str, List[Change]]:
+def process_multiline_from_collections_import(
+    block: List[str], line_no: int, line_ending: str
+) -> Tuple[List[str], List[Change]]:
+    """Rewrite a ``from collections import`` statement spanning several lines.
+
+    The statement is tokenized so parenthesized and backslash-continued
+    forms are handled alike; comments and layout are kept untouched.
+    """
     changes: List[Change] = []
-    new_line = line
-    for pattern, replacement in REPLACEMENTS.items():
-        if pattern.search(new_line):
-            new_line = pattern.sub(replacement, new_line)
-            changes.append(Change(line_no, f"replaced {pattern.pattern} with {replacement}"))
+    text = "".join(block)
+    offsets = [0]
+    for line in block:
+        offsets.append(offsets[-1] + len(line))
+
+    module_span: Optional[Tuple[int, int]] = None
+    # (import item, start offset, end offset of the name, end offset
+    # including a trailing comma)
+    items: List[Tuple[str, int, int, int]] = []
+    names: List[str] = []
+    item_start = item_end = 0
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(text).readline):
+            start = offsets[tok.start[0] - 1] + tok.start[1]
+            end = offsets[tok.end[0] - 1] + tok.end[1]
+            if tok.type == tokenize.NEWLINE:
+                break
+            if module_span is None:
+                if tok.type == tokenize.NAME and tok.string == "collections":
+                    module_span = (start, end)
+                continue
+            if tok.type == tokenize.NAME:
+                if tok.string == "import" and not items and not names:
+                    continue
+                if not names:
+                    item_start = start
+                names.append(tok.string)
+                item_end = end
+            elif tok.type == tokenize.OP and tok.string in (",", ")") and names:
+                items.append((" ".join(names), item_start, item_end, end if tok.string == "," else item_end))
+                names = []
+        if names:
+            items.append((" ".join(names), item_start, item_end, item_end))
+    except (tokenize.TokenError, SyntaxError):
+        return block, changes
+
+    mutable_items = [item for item in items if base_import_name(item[0]) == "MutableMapping"]
+    if module_span is None or not mutable_items:
+        return block, changes
+
+    if len(mutable_items) == len(items):
+        start, end = module_span
+        changes.append(Change(line_no, "replaced collections import with collections.abc for MutableMapping"))
+        return split_lines(text[:start] + "collections.abc" + text[end:]), changes
+
+    spans: List[Tuple[int, int]] = []
+    kept_end = None
+    for name, start, name_end, end in items:
+        if base_import_name(name) != "MutableMapping":
+            kept_end = name_end
+            continue
+        if end == name_end and kept_end is not None:
+            # No trailing comma: take the separator before the item instead.
+            start = kept_end
+        if spans and start <= spans[-1][1]:
+            start = min(start, spans.pop()[0])
+        spans.append((start, end))
+
+    pieces: List[str] = []
+    pos = 0
+    for start, end in spans:
+        pieces.append(text[pos:start])
+        pos = end
+        while pos < len(text) and text[pos] in " \t":
+            pos += 1
+    pieces.append(text[pos:])
+    new_lines = [line for line in split_lines("".join(pieces)) if line.strip()]
+
+    if not new_lines[-1].endswith(("\r", "\n")):
+        new_lines[-1] += line_ending
+    indent = block[0][: len(block[0]) - len(block[0].lstrip())]
+    mutable_imports = ", ".join(item[0] for item in mutable_items)
+    new_lines.append(f"{indent}from collections.abc import {mutable_imports}{line_ending}")
+    changes.append(Change(line_no, "removed MutableMapping from collections import"))
+    return new_lines, changes
+
+
+def _usage_replacement(match: "re.Match[str]") -> str:
+    return REPLACEMENTS[match.group(0)]
+
+
+def replace_collections_usage(line: str, line_no: int) -> Tuple[str, List[Change]]:
+    if "collections." not in line:
+        return line, []
+    found = COLLECTIONS_USAGE_RE.findall(line)
+    if not found:
+        return line, []
+    new_line = COLLECTIONS_USAGE_RE.sub(_usage_replacement, line)
+    changes = [Change(line_no, f"replaced {name} with {REPLACEMENTS[name]}") for name in dict.fromkeys(found)]
     return new_line, changes
 
 
-def has_collections_abc_import(lines: Iterable[str]) -> bool:
-    return any(COLLECTIONS_ABC_IMPORT_RE.match(line) for line in lines)
+def is_collections_import_node(node: ast.stmt) -> bool:
+    if isinstance(node, ast.ImportFrom):
+        return node.module == "collections" and not node.level
+    if isinstance(node, ast.Import):
+        return any(
+            alias.name == "collections" or alias.name.startswith("collections.")
+            for alias in node.names
+        )
+    return False
 
 
-def has_collections_import(lines: Iterable[str]) -> bool:
-    for line in lines:
-        if not COLLECTIONS_IMPORT_RE.match(line):
-            continue
-        if line.lstrip().startswith("import "):
-            match = IMPORT_COLLECTIONS_RE.match(line)
-            if not match:
-                return True
-            code, _ = split_comment(match.group("imports"))
-            items = parse_import_items(code)
-            if any(base_import_name(item).startswith("collections") for item in items):
-                return True
+def find_candidate_lines(content: str) -> Tuple[Optional[Dict[int, int]], Optional[int]]:
+    """Map the first line of each collections import/usage to its last line.
+
+    Also returns the last line of the final module-level collections import,
+    where ``import collections.abc`` goes if needed. Strings and comments are
+    skipped by construction. ``(None, None)`` is returned when the file
+    cannot be parsed, in which case every line is a candidate.
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None, None
+
+    last_import_line = None
+    for stmt in tree.body:
+        if is_collections_import_node(stmt):
+            last_import_line = stmt.end_lineno
+
+    candidates: Dict[int, int] = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom):
+            if node.module != "collections" or node.level:
+                continue
+        elif isinstance(node, ast.Attribute):
+            if (
+                node.attr not in REPLACED_ATTRIBUTES
+                or not isinstance(node.value, ast.Name)
+                or node.value.id != "collections"
+            ):
+                continue
         else:
-            return True
-    return False
+            continue
+        end_lineno = node.end_lineno if isinstance(node, ast.ImportFrom) else node.lineno
+        candidates[node.lineno] = max(candidates.get(node.lineno, 0), end_lineno or node.lineno)
+    return candidates, last_import_line
 
 
-def insert_collections_abc_import(lines: List[str], newline: str, changes: List[Change]) -> None:
-    insert_at = None
-    for idx, line in enumerate(lines):
-        if COLLECTIONS_IMPORT_RE.match(line):
-            insert_at = idx + 1
-    if insert_at is None:
-        return
-    lines.insert(insert_at, f"import collections.abc{newline}")
-    changes.append(Change(insert_at + 1, "added import collections.abc"))
+def is_collections_import(line: str) -> bool:
+    if not COLLECTIONS_IMPORT_RE.match(line):
+        return False
+    if not line.lstrip().startswith("import "):
+        return True
+    match = IMPORT_COLLECTIONS_RE.match(line)
+    if not match:
+        return True
+    code, _ = split_comment(match.group("imports"))
+    items = parse_import_items(code)
+    return any(base_import_name(item).startswith("collections") for item in items)
+
+
+def scan_imports(lines: Iterable[str]) -> Tuple[bool, bool]:
+    """Return whether collections and collections.abc are imported."""
+    has_collections = False
+    has_collections_abc = False
+    for line in lines:
+        if "collections" not in line:
+            continue
+        if not has_collections_abc and COLLECTIONS_ABC_IMPORT_RE.match(line):
+            has_collections_abc = True
+        if not has_collections and is_collections_import(line):
+            has_collections = True
+        if has_collections and has_collections_abc:
+            break
+    return has_collections, has_collections_abc
 
 
 def backup_path(path: Path, backup_ext: str) -> Path:
@@ -156,63 +314,139 @@ def backup_path(path: Path, backup_ext: str) -> Path:
         counter += 1
 
 
-def process_file(path: Path, dry_run: bool, backup_ext: str, logger: logging.Logger) -> FileResult:
+def create_backup(path: Path, backup: Path) -> None:
+    try:
+        os.link(path, backup)
+    except (OSError, AttributeError):
+        shutil.copy2(path, backup)
+
+
+def process_file(path: Path, dry_run: bool, backup_ext: str) -> FileResult:
     changes: List[Change] = []
+    messages: List[LogMessage] = []
     try:
-        with tokenize.open(path) as handle:
-            encoding = handle.encoding or "utf-8"
-            content = handle.read()
+        # Decode without newline translation so CRLF files stay CRLF.
+        with open(path, "rb") as handle:
+            encoding, _ = tokenize.detect_encoding(handle.readline)
+            handle.seek(0)
+            content = handle.read().decode(encoding)
     except (SyntaxError, UnicodeDecodeError, OSError) as exc:
-        logger.warning("Skipping %s due to read error: %s", path, exc)
+        messages.append((logging.WARNING, "Skipping %s due to read error: %s", (path, str(exc))))
+        return FileResult(path, [], False, messages)
+
+    if "collections" not in content or not REWRITE_PROBE_RE.search(content):
         return FileResult(path, [], False)
 
     newline = "\r\n" if "\r\n" in content else "\n"
-    lines = content.splitlines(keepends=True)
-
-    collections_imported = has_collections_import(lines)
-    collections_abc_imported = has_collections_abc_import(lines)
-
-    updated_lines: List[str] = []
-    for idx, line in enumerate(lines, start=1):
-        new_lines, import_changes = process_from_collections_import(line, idx)
-        if import_changes:
-            changes.extend(import_changes)
+    lines = split_lines(content)
+
+    collections_imported, collections_abc_imported = scan_imports(lines)
+
+    candidates, last_import_line = find_candidate_lines(content)
+
+    needs_abc_import = collections_imported and not collections_abc_imported
+    # (offset, line number) just past the last module-level collections
+    # import written.
+    insert_at: Optional[Tuple[int, int]] = None
+    buf = io.StringIO()
+    out_line_no = 0
+    idx = 0
+    while idx < len(lines):
+        line = lines[idx]
+        idx += 1
+        last_line_no = idx if candidates is None else candidates.get(idx)
+        if last_line_no is None:
+            new_lines = [line]
+        else:
+            if last_line_no > idx:
+                block = lines[idx - 1:last_line_no]
+                new_lines, import_changes = process_multiline_from_collections_import(block, idx, newline)
+                line_no, idx = idx, last_line_no
+            else:
+                new_lines, import_changes = process_from_collections_import(line, idx, newline)
+                line_no = idx
+            if import_changes:
+                # The rewrite always emits a "from collections.abc import".
+                changes.extend(import_changes)
+                needs_abc_import = False
+            replaced_lines: List[str] = []
+            for new_line in new_lines:
+                replaced_line, line_changes = replace_collections_usage(new_line, line_no)
+                replaced_lines.append(replaced_line)
+                changes.extend(line_changes)
+            new_lines = replaced_lines
         for new_line in new_lines:
-            replaced_line, line_changes = replace_collections_usage(new_line, idx)
-            updated_lines.append(replaced_line)
-            changes.extend(line_changes)
-
-    if collections_imported and not collections_abc_imported:
-        if not has_collections_abc_import(updated_lines):
-            insert_collections_abc_import(updated_lines, newline, changes)
+            buf.write(new_line)
+            out_line_no += 1
+        # Only after a whole statement, never between its lines.
+        if candidates is None:
+            # Unparsable file: fall back to matching the emitted lines.
+            if needs_abc_import and any(COLLECTIONS_IMPORT_RE.match(new_line) for new_line in new_lines):
+                insert_at = (buf.tell(), out_line_no)
+        elif insert_at is None and last_import_line is not None and idx >= last_import_line:
+            insert_at = (buf.tell(), out_line_no)
+
+    updated_content = buf.getvalue()
+    if needs_abc_import and insert_at is not None:
+        offset, line_no = insert_at
+        updated_content = (
+            f"{updated_content[:offset]}import collections.abc{newline}{updated_content[offset:]}"
+        )
+        changes.append(Change(line_no + 1, "added import collections.abc"))
 
-    updated_content = "".join(updated_lines)
     if updated_content == content:
         return FileResult(path, [], False)
 
+    backup = None
     if dry_run:
-        logger.info("[dry-run] Would update %s", path)
+        messages.append((logging.INFO, "[dry-run] Would update %s", (path,)))
     else:
         backup = backup_path(path, backup_ext)
-        shutil.copy2(path, backup)
-        with open(path, "w", encoding=encoding, newline="") as handle:
-            handle.write(updated_content)
-        logger.info("Updated %s (backup: %s)", path, backup)
+        create_backup(path, backup)
+        # Write next to the original and swap it in, so a hardlinked
+        # backup keeps pointing at the untouched inode.
+        tmp_path = path.with_name(path.name + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding=encoding, newline="") as handle:
+                handle.write(updated_content)
+            shutil.copymode(path, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        messages.append((logging.INFO, "Updated %s (backup: %s)", (path, backup)))
 
     for change in changes:
-        logger.info("%s:%s %s", path, change.line_no, change.description)
+        messages.append((logging.INFO, "%s:%s %s", (path, change.line_no, change.description)))
 
-    return FileResult(path, changes, True)
+    return FileResult(path, changes, True, messages, backup)
 
 
 def iter_py_files(root: Path, backup_ext: str) -> Iterable[Path]:
-    for dirpath, _, filenames in os.walk(root):
-        for filename in filenames:
-            if not filename.endswith(".py"):
-                continue
-            if filename.endswith(backup_ext):
-                continue
-            yield Path(dirpath) / filename
+    pending = [str(root)]
+    while pending:
+        subdirs: List[str] = []
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                        continue
+                    name = entry.name
+                    if not name.endswith(".py") or name.endswith(backup_ext):
+                        continue
+                    if entry.is_file(follow_symlinks=False):
+                        yield Path(entry.path)
+        except OSError:
+            continue
+        pending.extend(reversed(subdirs))
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
 
 
 def build_arg_parser() -> argparse.ArgumentParser:
@@ -235,6 +469,17 @@ def build_arg_parser() -> argparse.ArgumentParser:
         default=None,
         help="Optional log file path",
     )
+    parser.add_argument(
+        "--jobs",
+        type=positive_int,
+        default=None,
+        help="Number of worker processes (default: CPU count, 1 disables the pool)",
+    )
+    parser.add_argument(
+        "--print-backups",
+        action="store_true",
+        help="Print the path of each backup file created to stdout, one per line",
+    )
     return parser
 
 
@@ -255,6 +500,15 @@ def setup_logger(log_file: str | None) -> logging.Logger:
     return logger
 
 
+def process_files(paths: List[Path], dry_run: bool, backup_ext: str, jobs: Optional[int]) -> Iterator[FileResult]:
+    worker = functools.partial(process_file, dry_run=dry_run, backup_ext=backup_ext)
+    if jobs == 1 or len(paths) < 2:
+        yield from map(worker, paths)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(worker, paths, chunksize=32)
+
+
 def main() -> int:
     parser = build_arg_parser()
     args = parser.parse_args()
@@ -266,9 +520,14 @@ def main() -> int:
         logger.error("Path does not exist: %s", root)
         return 2
 
+    paths = list(iter_py_files(root, args.backup_ext))
     results: List[FileResult] = []
-    for path in iter_py_files(root, args.backup_ext):
-        results.append(process_file(path, args.dry_run, args.backup_ext, logger))
+    for result in process_files(paths, args.dry_run, args.backup_ext, args.jobs):
+        for level, msg, msg_args in result.messages:
+            logger.log(level, msg, *msg_args)
+        if args.print_backups and result.backup is not None:
+            print(result.backup)
+        results.append(result)
 
     updated_files = [result for result in results if result.updated]
     logger.info("Processed %s files, updated %s", len(results), len(updated_files))
@@ -12,7 +12,7 @@ from ryu.lib import dnspython_compat
 
 
 def main() -> None:
-    dnspython_compat.apply()
+    dnspython_compat.patch_eventlet_dnspython()
 
 
 if __name__ == "__main__":
@@ -3,16 +3,23 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import hashlib
+import io
 import json
-import shutil
-import subprocess
+import os
+import re
 import sys
 from dataclasses import dataclass
-from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, TextIO, Tuple
 
-import importlib.metadata as metadata
+# subprocess, shutil, datetime, concurrent.futures, importlib.metadata,
+# packaging and orjson are imported where they are used so that --rollback
+# and --help start without them.
+if TYPE_CHECKING:
+    import subprocess
 
 
 BACKUP_EXT = ".ryu-modernize.bak"
@@ -36,6 +43,38 @@ REQUIRED_DEPENDENCIES = {
 }
 
 REQUIREMENTS_HEADER = "# Ryu modernization compatibility requirements"
+# The name must be followed by a version specifier, a marker or nothing, so
+# extras ("pkg[extra]") and direct references ("pkg @ url") are left alone.
+REQUIREMENT_NAME_RE = re.compile(r"^\s*([A-Za-z0-9_.\-]+)\s*(?=[<>=~!;]|$)")
+
+ALREADY_HANDLED_BLOCK = (
+    "class _AlreadyHandledResponse(Response):\n"
+    "    # XXX: Eventlet API should not be used directly.\n"
+    "    # https://github.com/benoitc/gunicorn/pull/2581\n"
+    "    from packaging import version\n"
+    "    import eventlet\n"
+    "    if version.parse(eventlet.__version__) >= version.parse(\"0.30.3\"):\n"
+    "        import eventlet.wsgi\n"
+    "        _ALREADY_HANDLED = getattr(eventlet.wsgi, \"ALREADY_HANDLED\", None)\n"
+    "    else:\n"
+    "        from eventlet.wsgi import ALREADY_HANDLED\n"
+    "        _ALREADY_HANDLED = ALREADY_HANDLED\n"
+    "\n"
+    "    def __call__(self, environ, start_response):\n"
+    "        return self._ALREADY_HANDLED\n"
+    "\n"
+    "\n"
+)
+ALREADY_HANDLED_BLOCK_CRLF = ALREADY_HANDLED_BLOCK.replace("\n", "\r\n")
+TOP_LEVEL_LINE_RE = re.compile(r"^\S", re.M)
+
+# The state file is only read back by this tool, so it is written compactly.
+STATE_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+
+
+# Backups and created files are tracked as sets while the tool runs and
+# serialized as sorted lists; the *_hash entries are plain hex digests.
+State = Dict[str, Any]
 
 
 @dataclass
@@ -53,21 +92,50 @@ def check_python_version() -> Optional[str]:
     return None
 
 
-def parse_requirement(spec: str) -> "object":
+@functools.lru_cache(maxsize=None)
+def packaging_version() -> Optional[ModuleType]:
     try:
         from packaging import version
     except ImportError:
         return None
+    return version
+
+
+def parse_requirement(spec: str) -> "object":
+    version = packaging_version()
+    if version is None:
+        return None
     return version.parse(spec.lstrip("<>~=!="))
 
 
+@functools.lru_cache(maxsize=None)
+def required_versions() -> Dict[str, object]:
+    return {name: parse_requirement(spec) for name, spec in REQUIRED_DEPENDENCIES.items()}
+
+
+def installed_versions(names: Iterable[str]) -> Dict[str, str]:
+    """Return the installed version of each of names that is installed."""
+    import importlib.metadata as metadata
+
+    # metadata.version() reuses importlib's cached sys.path listings, so a
+    # lookup per wanted name beats loading every distribution's METADATA.
+    versions: Dict[str, str] = {}
+    for name in names:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            continue
+    return versions
+
+
 def check_dependencies() -> Dict[str, Dict[str, Optional[str]]]:
     results: Dict[str, Dict[str, Optional[str]]] = {}
+    versions = installed_versions(REQUIRED_DEPENDENCIES)
+    required = required_versions()
     for name, requirement in REQUIRED_DEPENDENCIES.items():
-        required_version = parse_requirement(requirement)
-        try:
-            installed = metadata.version(name)
-        except metadata.PackageNotFoundError:
+        required_version = required[name]
+        installed = versions.get(name)
+        if installed is None:
             results[name] = {
                 "required": requirement,
                 "installed": None,
@@ -77,14 +145,10 @@ def check_dependencies() -> Dict[str, Dict[str, Optional[str]]]:
 
         if required_version is None:
             status = "unknown"
+        elif packaging_version().parse(installed) < required_version:
+            status = "outdated"
         else:
-            from packaging import version
-
-            installed_version = version.parse(installed)
-            if installed_version < required_version:
-                status = "outdated"
-            else:
-                status = "ok"
+            status = "ok"
         results[name] = {
             "required": requirement,
             "installed": installed,
@@ -93,30 +157,85 @@ def check_dependencies() -> Dict[str, Dict[str, Optional[str]]]:
     return results
 
 
-def load_state(state_path: Path) -> Dict[str, List[str]]:
+def load_state(state_path: Path) -> State:
     if not state_path.exists():
-        return {"backups": [], "created_files": []}
-    return json.loads(state_path.read_text(encoding="utf-8"))
+        return {"backups": set(), "created_files": set()}
+    raw = json.loads(state_path.read_text(encoding="utf-8"))
+    state: State = {
+        "backups": set(raw.get("backups", [])),
+        "created_files": set(raw.get("created_files", [])),
+    }
+    for key in ("requirements_hash", "report_hash"):
+        if raw.get(key):
+            state[key] = raw[key]
+    return state
+
+
+def save_state(state_path: Path, state: State) -> None:
+    serialized = {
+        key: sorted(value) if isinstance(value, set) else value
+        for key, value in state.items()
+    }
+    state_path.write_bytes(STATE_ENCODER.encode(serialized).encode("utf-8"))
 
 
-def save_state(state_path: Path, state: Dict[str, List[str]]) -> None:
-    state_path.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+@functools.lru_cache(maxsize=None)
+def load_orjson() -> Optional[ModuleType]:
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
 
+def dumps_report(report: Dict[str, object]) -> bytes:
+    orjson = load_orjson()
+    if orjson is not None:
+        return orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+    return json.dumps(report, indent=2, sort_keys=True).encode("utf-8")
 
-def ensure_backup(path: Path, state: Dict[str, List[str]]) -> None:
+
+def ensure_backup(path: Path, state: State, exists: Optional[bool] = None) -> None:
+    """Back up path once; exists may carry a caller's cached path.exists()."""
     backup_path = path.with_name(path.name + BACKUP_EXT)
     if backup_path.exists():
-        if str(backup_path) not in state["backups"]:
-            state["backups"].append(str(backup_path))
+        state["backups"].add(str(backup_path))
         return
-    if not path.exists():
+    if not (path.exists() if exists is None else exists):
         return
+    import shutil
+
     shutil.copy2(path, backup_path)
-    state["backups"].append(str(backup_path))
+    state["backups"].add(str(backup_path))
 
 
-def apply_collections_fix(repo_root: Path, state: Dict[str, List[str]]) -> Optional[Path]:
-    log_path = repo_root / COLLECTIONS_LOG
+def atomic_update(path: Path, data: bytes, state: State, exists: Optional[bool] = None) -> None:
+    """Swap data in for path with a single rename, keeping the original as its backup."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        tmp_path.write_bytes(data)
+        if path.exists() if exists is None else exists:
+            import shutil
+
+            shutil.copymode(path, tmp_path)
+            backup_path = path.with_name(path.name + BACKUP_EXT)
+            # An existing backup already holds the pre-modernization file.
+            if not backup_path.exists():
+                # The hardlink keeps the original inode once path is replaced.
+                try:
+                    os.link(path, backup_path)
+                except (OSError, AttributeError):
+                    shutil.copy2(path, backup_path)
+            state["backups"].add(str(backup_path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def start_collections_fix(repo_root: Path) -> "subprocess.Popen[str]":
+    import subprocess
+
     cmd = [
         sys.executable,
         str(repo_root / "tools" / "fix_collections_imports.py"),
@@ -124,154 +243,157 @@ def apply_collections_fix(repo_root: Path, state: Dict[str, List[str]]) -> Optio
         "--backup-ext",
         BACKUP_EXT,
         "--log-file",
-        str(log_path),
+        str(repo_root / COLLECTIONS_LOG),
+        "--print-backups",
     ]
-    subprocess.run(cmd, check=False)
-
-    for backup in repo_root.rglob(f"*{BACKUP_EXT}"):
-        backup_str = str(backup)
-        if backup_str not in state["backups"]:
-            state["backups"].append(backup_str)
-
-    if log_path.exists() and str(log_path) not in state["created_files"]:
-        if log_path.exists():
-            state["created_files"].append(str(log_path))
-        return log_path
-    return log_path if log_path.exists() else None
-
-
-def find_class_block(lines: List[str], class_name: str) -> Optional[tuple[int, int]]:
-    for idx, line in enumerate(lines):
-        if line.startswith(f"class {class_name}"):
-            indent = len(line) - len(line.lstrip())
-            end = idx + 1
-            while end < len(lines):
-                if lines[end].strip() == "":
-                    end += 1
-                    continue
-                current_indent = len(lines[end]) - len(lines[end].lstrip())
-                if current_indent <= indent:
-                    break
-                end += 1
-            return idx, end
-    return None
+    return subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
 
 
-def ensure_eventlet_already_handled(path: Path, state: Dict[str, List[str]], changes: List[ChangeRecord]) -> None:
-    content = path.read_text(encoding="utf-8")
-    lines = content.splitlines(keepends=True)
-    block = find_class_block(lines, "_AlreadyHandledResponse")
+def apply_collections_fix(repo_root: Path, process: "subprocess.Popen[str]", state: State) -> Optional[Path]:
+    """Wait for the fixer started by start_collections_fix and record its output."""
+    stdout, _ = process.communicate()
+    log_path = repo_root / COLLECTIONS_LOG
+
+    if process.returncode == 0:
+        # The fixer prints each backup it made. Numbered ones (.bak.1, ...)
+        # are skipped because rollback can only map BACKUP_EXT names back.
+        for line in stdout.splitlines():
+            if line.endswith(BACKUP_EXT):
+                state["backups"].add(line)
+    else:
+        # The fixer may have stopped before reporting everything, so fall
+        # back to looking for backups under the directory handed to it.
+        for dirpath, _, filenames in os.walk(repo_root / "ryu"):
+            for filename in filenames:
+                if filename.endswith(BACKUP_EXT):
+                    state["backups"].add(os.path.join(dirpath, filename))
+
+    if not log_path.exists():
+        return None
+    state["created_files"].add(str(log_path))
+    return log_path
+
+
+def find_class_block(content: str, class_name: str) -> Optional[Tuple[int, int]]:
+    """Return the (start, end) offsets of a top-level class in content."""
+    match = re.search(rf"^class {re.escape(class_name)}\b", content, re.M)
+    if not match:
+        return None
+    start = match.start()
+    # The class sits at column 0, so its block ends at the first line that
+    # starts with a non-whitespace character; blank lines stay inside it.
+    pos = content.find("\n", start)
+    if pos < 0:
+        return start, len(content)
+    end = TOP_LEVEL_LINE_RE.search(content, pos + 1)
+    return start, end.start() if end else len(content)
+
+
+def ensure_eventlet_already_handled(path: Path, state: State, changes: List[ChangeRecord]) -> None:
+    # Decoded from bytes: read_text() would turn CRLF into LF.
+    content = path.read_bytes().decode("utf-8")
+    block = find_class_block(content, "_AlreadyHandledResponse")
     if not block:
         return
     start, end = block
-    block_text = "".join(lines[start:end])
+    block_text = content[start:end]
     if "eventlet.wsgi" in block_text and "ALREADY_HANDLED" in block_text:
         return
 
-    newline = "\n"
-    if "\r\n" in content:
-        newline = "\r\n"
-
-    new_block = (
-        "class _AlreadyHandledResponse(Response):" + newline
-        "    # XXX: Eventlet API should not be used directly." + newline
-        "    # https://github.com/benoitc/gunicorn/pull/2581" + newline
-        "    from packaging import version" + newline
-        "    import eventlet" + newline
-        "    if version.parse(eventlet.__version__) >= version.parse(\"0.30.3\"):" + newline
-        "        import eventlet.wsgi" + newline
-        "        _ALREADY_HANDLED = getattr(eventlet.wsgi, \"ALREADY_HANDLED\", None)" + newline
-        "    else:" + newline
-        "        from eventlet.wsgi import ALREADY_HANDLED" + newline
-        "        _ALREADY_HANDLED = ALREADY_HANDLED" + newline
-        "" + newline
-        "    def __call__(self, environ, start_response):" + newline
-        "        return self._ALREADY_HANDLED" + newline
-        newline
-    )
+    new_block = ALREADY_HANDLED_BLOCK_CRLF if "\r\n" in block_text else ALREADY_HANDLED_BLOCK
 
-    ensure_backup(path, state)
-    new_content = "".join(lines[:start]) + new_block + "".join(lines[end:])
-    path.write_text(new_content, encoding="utf-8")
+    new_content = content[:start] + new_block + content[end:]
+    atomic_update(path, new_content.encode("utf-8"), state)
     changes.append(ChangeRecord(str(path), "Updated _AlreadyHandledResponse for eventlet compatibility"))
 
 
-def ensure_dnspython_compat(path: Path, state: Dict[str, List[str]], changes: List[ChangeRecord]) -> None:
-    content = path.read_text(encoding="utf-8")
+def ensure_dnspython_compat(path: Path, state: State, changes: List[ChangeRecord]) -> None:
+    content = path.read_bytes().decode("utf-8")
     if "dnspython_compat.patch_eventlet_dnspython()" in content:
         return
 
-    target_line = "    import eventlet\n"
-    if target_line not in content:
+    newline = "\r\n" if "\r\n" in content else "\n"
+    target_line = "    import eventlet" + newline
+    index = content.find(target_line)
+    if index < 0:
         return
-
-    newline = "\n"
-    if "\r\n" in content:
-        newline = "\r\n"
-        target_line = "    import eventlet\r\n"
+    index += len(target_line)
 
     insertion = (
-        target_line
-        + "    from ryu.lib import dnspython_compat" + newline
+        "    from ryu.lib import dnspython_compat" + newline
         + "    dnspython_compat.patch_eventlet_dnspython()" + newline
     )
 
-    ensure_backup(path, state)
-    new_content = content.replace(target_line, insertion, 1)
-    path.write_text(new_content, encoding="utf-8")
+    new_content = content[:index] + insertion + content[index:]
+    atomic_update(path, new_content.encode("utf-8"), state)
     changes.append(ChangeRecord(str(path), "Inserted dnspython tlsabase compatibility hook"))
 
 
 def normalize_requirement_line(line: str) -> Optional[str]:
-    stripped = line.strip()
-    if not stripped or stripped.startswith("#"):
+    match = REQUIREMENT_NAME_RE.match(line)
+    if not match:
         return None
-    name = stripped.split(";")[0]
-    for token in ["==", ">=", "<=", "~=", "<", ">"]:
-        if token in name:
-            return name.split(token, 1)[0].strip().lower()
-    return name.strip().lower()
+    return match.group(1).lower()
 
 
-def update_requirements(path: Path, state: Dict[str, List[str]], changes: List[ChangeRecord]) -> None:
+def requirements_digest(data: bytes) -> str:
+    """Fingerprint requirements.txt together with the pins it must satisfy."""
+    hasher = hashlib.blake2b(REQUIREMENTS_HEADER.encode("utf-8"))
+    for name, spec in REQUIRED_DEPENDENCIES.items():
+        hasher.update(f"\n{name}{spec}".encode("utf-8"))
+    hasher.update(b"\0")
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+def update_requirements(path: Path, state: State, changes: List[ChangeRecord]) -> None:
     required_lines = [
         REQUIREMENTS_HEADER,
         "",
     ] + [f"{name}{spec}" for name, spec in REQUIRED_DEPENDENCIES.items()]
 
-    if path.exists():
-        content = path.read_text(encoding="utf-8")
-        lines = content.splitlines()
-    else:
-        content = ""
-        lines = []
-
-    existing_names = {}
-    updated_lines: List[str] = []
-    for line in lines:
+    digest = None
+    content = ""
+    exists = path.exists()
+    if exists:
+        raw = path.read_bytes()
+        # Unchanged since the last run left it in the expected shape, and
+        # the required pins have not changed either.
+        digest = requirements_digest(raw)
+        if digest == state.get("requirements_hash"):
+            return
+        content = raw.decode("utf-8")
+
+    # Pin known requirements in a single pass, emitting straight to the
+    # output buffer.
+    out = io.StringIO()
+    seen: Set[str] = set()
+    last_line: Optional[str] = None
+    for line in content.splitlines():
         name = normalize_requirement_line(line)
-        if name and name in REQUIRED_DEPENDENCIES:
-            updated_lines.append(f"{name}{REQUIRED_DEPENDENCIES[name]}")
-            existing_names[name] = True
-        else:
-            updated_lines.append(line)
-
-    missing = [name for name in REQUIRED_DEPENDENCIES if name not in existing_names]
-    if missing:
-        if updated_lines and updated_lines[-1].strip() != "":
-            updated_lines.append("")
-        updated_lines.extend(required_lines)
-
-    new_content = "\n".join(updated_lines).rstrip() + "\n"
+        if name in REQUIRED_DEPENDENCIES:
+            line = f"{name}{REQUIRED_DEPENDENCIES[name]}"
+            seen.add(name)
+        out.write(line)
+        out.write("\n")
+        last_line = line
+
+    if len(seen) < len(REQUIRED_DEPENDENCIES):
+        if last_line is not None and last_line.strip() != "":
+            out.write("\n")
+        out.write("\n".join(required_lines))
+
+    new_content = out.getvalue().rstrip() + "\n"
     if new_content == content:
+        state["requirements_hash"] = digest
         return
 
-    if path.exists():
-        ensure_backup(path, state)
-    else:
-        state["created_files"].append(str(path))
+    if not exists:
+        state["created_files"].add(str(path))
 
-    path.write_text(new_content, encoding="utf-8")
+    data = new_content.encode("utf-8")
+    atomic_update(path, data, state, exists=exists)
+    state["requirements_hash"] = requirements_digest(data)
     changes.append(ChangeRecord(str(path), "Updated requirements with modernization-compatible versions"))
 
 
@@ -283,6 +405,8 @@ def run_tests(repo_root: Path, command: List[str]) -> Dict[str, str]:
     }
     if not command:
         return result
+    import subprocess
+
     try:
         completed = subprocess.run(command, cwd=repo_root, check=False, capture_output=True, text=True)
         result["output"] = (completed.stdout + completed.stderr).strip()
@@ -295,13 +419,12 @@ def run_tests(repo_root: Path, command: List[str]) -> Dict[str, str]:
 
 def write_report(
     repo_root: Path,
-    state: Dict[str, List[str]],
+    state: State,
     changes: List[ChangeRecord],
     dependency_status: Dict[str, Dict[str, Optional[str]]],
     tests: Dict[str, str],
     python_issue: Optional[str],
 ) -> None:
-    timestamp = datetime.now(timezone.utc).isoformat()
     summary = {
         "python_ok": python_issue is None,
         "dependencies_ok": all(
@@ -310,8 +433,7 @@ def write_report(
         "patches_applied": bool(changes),
         "tests_status": tests.get("status", "skipped"),
     }
-    report = {
-        "timestamp": timestamp,
+    body = {
         "python": {
             "version": sys.version.split()[0],
             "issue": python_issue,
@@ -325,50 +447,59 @@ def write_report(
     report_json_path = repo_root / REPORT_JSON
     report_txt_path = repo_root / REPORT_TXT
 
-    if report_json_path.exists():
-        ensure_backup(report_json_path, state)
-    else:
-        state["created_files"].append(str(report_json_path))
+    # Everything but the timestamp is compared, so a re-run that found
+    # nothing new leaves the previous reports (and their backups) alone.
+    json_exists = report_json_path.exists()
+    txt_exists = report_txt_path.exists()
+    digest = hashlib.blake2b(dumps_report(body)).hexdigest()
+    if digest == state.get("report_hash") and json_exists and txt_exists:
+        return
+    from datetime import datetime, timezone
 
-    if report_txt_path.exists():
-        ensure_backup(report_txt_path, state)
-    else:
-        state["created_files"].append(str(report_txt_path))
+    report = {"timestamp": datetime.now(timezone.utc).isoformat(), **body}
 
-    report_json_path.write_text(json.dumps(report, indent=2, sort_keys=True), encoding="utf-8")
+    if json_exists:
+        ensure_backup(report_json_path, state, exists=True)
+    else:
+        state["created_files"].add(str(report_json_path))
 
-    lines = [
-        f"Ryu modernization report ({timestamp})",
-        "",
-        f"Python version: {report['python']['version']}",
-    ]
-    if python_issue:
-        lines.append(f"Python issue: {python_issue}")
-    lines.append("")
-    lines.append("Dependency status:")
-    for name, details in dependency_status.items():
-        lines.append(
-            f"- {name}: {details['status']} (installed={details['installed']}, required={details['required']})"
+    if txt_exists:
+        ensure_backup(report_txt_path, state, exists=True)
+    else:
+        state["created_files"].add(str(report_txt_path))
+
+    report_json_path.write_bytes(dumps_report(report))
+
+    with report_txt_path.open("w", encoding="utf-8") as handle:
+        write_text_report(handle, report)
+    state["report_hash"] = digest
+
+
+def write_text_report(out: TextIO, report: Dict[str, Any]) -> None:
+    python = report["python"]
+    tests = report["tests"]
+    out.write(f"Ryu modernization report ({report['timestamp']})\n\n")
+    out.write(f"Python version: {python['version']}\n")
+    if python["issue"]:
+        out.write(f"Python issue: {python['issue']}\n")
+    out.write("\nDependency status:\n")
+    for name, details in report["dependencies"].items():
+        out.write(
+            f"- {name}: {details['status']} (installed={details['installed']}, required={details['required']})\n"
         )
-    lines.append("")
-    lines.append("Changes applied:")
-    if changes:
-        for change in changes:
-            lines.append(f"- {change.path}: {change.description}")
+    out.write("\nChanges applied:\n")
+    if report["changes"]:
+        for change in report["changes"]:
+            out.write(f"- {change['path']}: {change['description']}\n")
     else:
-        lines.append("- No changes needed.")
-    lines.append("")
-    lines.append("Tests:")
-    lines.append(f"- {tests.get('status', 'skipped')}: {tests.get('command', '')}")
+        out.write("- No changes needed.\n")
+    out.write("\nTests:\n")
+    out.write(f"- {tests.get('status', 'skipped')}: {tests.get('command', '')}\n")
     if tests.get("output"):
-        lines.append("Output:")
-        lines.append(tests["output"])
-    lines.append("")
-    lines.append("Compatibility summary:")
-    for key, value in summary.items():
-        lines.append(f"- {key}: {value}")
-
-    report_txt_path.write_text("\n".join(lines).strip() + "\n", encoding="utf-8")
+        out.write(f"Output:\n{tests['output']}\n")
+    out.write("\nCompatibility summary:\n")
+    for key, value in report["summary"].items():
+        out.write(f"- {key}: {value}\n")
 
 
 def rollback(repo_root: Path) -> int:
@@ -383,8 +514,13 @@ def rollback(repo_root: Path) -> int:
         if not backup_path.exists():
             continue
         original = backup_path.with_name(backup_path.name[: -len(BACKUP_EXT)])
-        shutil.copy2(backup_path, original)
-        backup_path.unlink()
+        try:
+            os.replace(backup_path, original)
+        except OSError:
+            import shutil
+
+            shutil.copy2(backup_path, original)
+            backup_path.unlink()
 
     for created in state.get("created_files", []):
         created_path = Path(created)
@@ -397,17 +533,37 @@ def rollback(repo_root: Path) -> int:
 
 
 def apply(repo_root: Path, test_command: Optional[str], skip_tests: bool) -> int:
+    from concurrent.futures import ThreadPoolExecutor
+
     state_path = repo_root / STATE_FILE
     state = load_state(state_path)
     changes: List[ChangeRecord] = []
 
     python_issue = check_python_version()
-    dependency_status = check_dependencies()
 
-    log_path = apply_collections_fix(repo_root, state)
+    # The dependency check and requirements.txt do not touch the ryu/ tree,
+    # so they run while the collections fixer rewrites it.
+    requirement_changes: List[ChangeRecord] = []
+    fix_process = start_collections_fix(repo_root)
+    try:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            dependencies = executor.submit(check_dependencies)
+            requirements = executor.submit(
+                update_requirements,
+                repo_root / "requirements.txt",
+                state,
+                requirement_changes,
+            )
+            dependency_status = dependencies.result()
+            requirements.result()
+    finally:
+        log_path = apply_collections_fix(repo_root, fix_process, state)
     if log_path:
         changes.append(ChangeRecord(str(log_path), "Collections import fix log generated"))
 
+    # wsgi.py and hub.py are inside the fixer's tree, so they are only
+    # patched once it has exited.
+
     ensure_eventlet_already_handled(
         repo_root / "ryu" / "app" / "wsgi.py",
         state,
@@ -418,7 +574,7 @@ def apply(repo_root: Path, test_command: Optional[str], skip_tests: bool) -> int
         state,
         changes,
     )
-    update_requirements(repo_root / "requirements.txt", state, changes)
+    changes.extend(requirement_changes)
 
     tests = {"status": "skipped", "command": "", "output": ""}
     if not skip_tests: